@@ -0,0 +1,173 @@
+import re
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Section-aware chunking for 10-K/10-Q filings. A filing is read as one stream
+# of lines across pages and cut at PART / Item / Note headings into parent
+# sections. Parents are what the chat prompt sees; non-overlapping child chunks
+# inside each parent are what gets embedded and searched. Tables are kept whole.
+
+CHILD_SIZE = 1000       # Max characters per embedded child chunk
+PARENT_SIZE = 3000      # Max characters per parent section returned to the LLM
+MIN_SECTION = 300       # Sections shorter than this (table of contents lines, PART headers) fold into the next
+
+# The splitter ingest_sec_vertexai used before section-aware chunking
+PAGE_CHUNK_SIZE = 1000
+PAGE_CHUNK_OVERLAP = 200
+
+# A heading title is capitalised words joined by short connectives, optionally followed
+# by a table-of-contents page number. Cross-references in prose ("Item 1A. Risk Factors,
+# and in our other filings", "Note 2. Summary ... in the Notes to the") do not fit.
+_TITLE_WORD = r"\(?[A-Z][\w’'&/-]*\)?"
+_CONNECTIVE = r"(?:of|and|or|the|for|on|in|to|by|with|from|about|a|an)"
+_TITLE = rf"{_TITLE_WORD}(?:,?\s+(?:{_CONNECTIVE}\s+)*{_TITLE_WORD})*(?:\s+\d{{1,3}})?"
+
+HEADING_PATTERNS = [
+    re.compile(rf"^(?i:PART)\s+(?:I{{1,3}}|IV)(?:\s*[\.:—–-]?\s+{_TITLE}|\s+\d{{1,3}})?$"),
+    re.compile(rf"^(?i:ITEM)\s+\d{{1,2}}[A-C]?\s*[\.:]\s*{_TITLE}$"),
+    re.compile(rf"^(?:NOTE|Note)\s+\d{{1,2}}\s*[\.:—–-]\s*{_TITLE}$"),
+    re.compile(r"^MANAGEMENT[’']S DISCUSSION AND ANALYSIS[A-Z ,'’]*$"),
+    re.compile(r"^RISK FACTORS$"),
+    re.compile(r"^(?:CONSOLIDATED|CONDENSED CONSOLIDATED) (?:BALANCE SHEETS|STATEMENTS OF [A-Z ,'’]+)$"),
+]
+_NUMBER_RE = re.compile(r"^[\$\(]*-?[\d,]+(?:\.\d+)?%?\)?$|^[\$—–-]$")
+
+def clean_text(text: str) -> str:
+    return text.replace("\x00", " ").strip()
+
+def is_heading(line: str) -> bool:
+    return len(line) < 150 and any(p.match(line) for p in HEADING_PATTERNS)
+
+def is_table_row(line: str) -> bool:
+    # Financial statement rows are mostly numbers, dashes and parenthesised negatives
+    tokens = line.split()
+    numbers = sum(1 for t in tokens if _NUMBER_RE.match(t))
+    return numbers >= 2 and numbers * 2 >= len(tokens)
+
+def page_chunks(docs, source_file: str) -> list[dict]:
+    # Original per-page splitter, kept for comparison with section_chunks
+    splitter = RecursiveCharacterTextSplitter(chunk_size=PAGE_CHUNK_SIZE, chunk_overlap=PAGE_CHUNK_OVERLAP)
+    chunks = []
+    for doc in docs:
+        for idx, chunk in enumerate(splitter.split_documents([doc])):
+            text = clean_text(chunk.page_content)
+            if not text:
+                continue
+            chunks.append({
+                "source_file": source_file,
+                "page": doc.metadata.get("page"),
+                "chunk_index": idx,
+                "content": text
+            })
+    return chunks
+
+def _blocks(lines: list) -> list:
+    # Group (page, line) pairs into atomic blocks: consecutive table rows stay together
+    blocks = []
+    for page, line in lines:
+        table = is_table_row(line)
+        if table and blocks and blocks[-1]["table"]:
+            blocks[-1]["lines"].append(line)
+        else:
+            blocks.append({"page": page, "table": table, "lines": [line]})
+    return blocks
+
+def _split_long(text: str, size: int) -> list:
+    # Last resort for a single block longer than size: cut at whitespace
+    pieces = []
+    while len(text) > size:
+        cut = text.rfind(" ", 0, size)
+        cut = cut if cut > 0 else size
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+def _pack(blocks: list, size: int) -> list:
+    # Greedily pack blocks into pieces of at most size characters. A piece is a list
+    # of (page, text) units so every piece knows the page each of its lines came from.
+    pieces, current, length = [], [], 0
+    for block in blocks:
+        for unit in _block_units(block, size):
+            if current and length + len(unit) > size:
+                pieces.append(current)
+                current, length = [], 0
+            if len(unit) > size:
+                pieces.extend([(block["page"], p)] for p in _split_long(unit, size))
+                continue
+            current.append((block["page"], unit))
+            length += len(unit) + 1
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _piece_text(piece: list) -> str:
+    return "\n".join(unit for _, unit in piece)
+
+def _block_units(block: dict, size: int) -> list:
+    # A table is one unit unless it would not fit in a piece; prose is packed line by line
+    text = "\n".join(block["lines"])
+    if block["table"] and len(text) <= size:
+        return [text]
+    return block["lines"]
+
+def _sections(lines: list) -> list:
+    sections = []
+    for page, line in lines:
+        if is_heading(line) or not sections:
+            sections.append({"title": line if is_heading(line) else "", "page": page, "lines": []})
+        sections[-1]["lines"].append((page, line))
+
+    merged = []
+    for section in sections:
+        section["size"] = sum(len(l) for _, l in section["lines"])
+        if merged and merged[-1]["size"] < MIN_SECTION:
+            # The short section is a lead-in to this one, which keeps its own heading
+            prev = merged.pop()
+            section["lines"] = prev["lines"] + section["lines"]
+            section["size"] += prev["size"]
+            section["page"] = prev["page"]
+            section["title"] = section["title"] or prev["title"]
+        merged.append(section)
+    return merged
+
+def section_chunks(docs, source_file: str):
+    # Returns (parents, children); children carry the parent_index they belong to
+    lines = []
+    for doc in docs:
+        page = doc.metadata.get("page")
+        for line in clean_text(doc.page_content).splitlines():
+            line = " ".join(line.split())
+            if line:
+                lines.append((page, line))
+
+    parents, children = [], []
+    for section in _sections(lines):
+        title = section["title"]
+        # Leave room for the "(continued)" heading and the title line prefixed to children
+        parent_size = PARENT_SIZE - len(title) - len(" (continued)") - 1 if title else PARENT_SIZE
+        child_size = CHILD_SIZE - len(title) - 1 if title else CHILD_SIZE
+        for part, piece in enumerate(_pack(_blocks(section["lines"]), parent_size)):
+            text = _piece_text(piece)
+            if part and title:
+                text = f"{title} (continued)\n{text}"
+            parent_index = len(parents)
+            parents.append({
+                "source_file": source_file,
+                "parent_index": parent_index,
+                "section": title,
+                "page": piece[0][0],
+                "content": text
+            })
+            piece_lines = [(page, line) for page, unit in piece for line in unit.splitlines()]
+            for child_piece in _pack(_blocks(piece_lines), child_size):
+                # Child text leads with the section title so the embedding knows where it sits
+                child = _piece_text(child_piece)
+                children.append({
+                    "source_file": source_file,
+                    "parent_index": parent_index,
+                    "page": child_piece[0][0],
+                    "chunk_index": len(children),
+                    "content": f"{title}\n{child}" if title else child
+                })
+    return parents, children
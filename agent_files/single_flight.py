@@ -0,0 +1,75 @@
+import re
+import threading
+
+# Single-flight coalescing: concurrent callers asking for the same key share one
+# in-flight computation. Streamlit runs each session in its own thread of the
+# same process, so a burst of identical questions costs one execution, not N.
+# Nothing is cached: once the call finishes, the next caller computes again.
+
+# Set on a thread while a timed-out follower computes for itself, so nested layers
+# run directly instead of joining the same hung call again. A follower therefore
+# waits at most one timeout in total, however many layers it passes through.
+_local = threading.local()
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self, timeout=120):
+        # Followers stop waiting after timeout seconds and compute for themselves
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        if getattr(_local, "bypass", False):
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                _local.bypass = True
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    _local.bypass = False
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            # KeyboardInterrupt/SystemExit too, so followers never read a missing result
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+# One group per layer so keys from different layers never collide
+question_flight = SingleFlight()
+embedding_flight = SingleFlight()
+sql_flight = SingleFlight()
+llm_flight = SingleFlight()
+
+def normalize_question(question: str) -> str:
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?.! ")
+
+def invoke_llm(llm, prompt: str):
+    # Identical prompts to the same model share one generation
+    return llm_flight.do((getattr(llm, "model", ""), prompt), llm.invoke, prompt)
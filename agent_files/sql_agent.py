@@ -1,6 +1,7 @@
 import os
 from agent_files.txt_to_sql import generate_sql_from_prompt
-from db.db_connector import run_sql_query
+from agent_files.single_flight import invoke_llm
+from agent_files.structured_engine import run_structured_query
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
@@ -29,7 +30,8 @@ def generate_sql_response(user_question: str) -> str:
         if sql.upper().startswith("-- ERROR") or not sql.lower().startswith("select"):
             return "Sorry, I couldn't generate a valid SQL query for your question."
 
-        results = run_sql_query(sql)
+        # Runs in-process over the CSV-backed columnar tables, Postgres for anything unsupported
+        results = run_structured_query(sql)
         if isinstance(results, dict) and "error" in results:
             return f"Database error occurred: {results['error']}"
         if not results:
@@ -47,7 +49,7 @@ def generate_sql_response(user_question: str) -> str:
 
         Provide a clear, concise answer in plain English (2–4 sentences). Do not mention SQL or technical details.
         """
-        response = llm.invoke(formatting_prompt)
+        response = invoke_llm(llm, formatting_prompt)
         return response.content.strip()
 
     except Exception as e:
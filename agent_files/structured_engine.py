@@ -0,0 +1,673 @@
+import os
+import re
+import csv
+import operator
+from functools import lru_cache
+import numpy as np
+
+# In-process engine for the structured tables. properties and financials are
+# small enough to hold as columnar NumPy arrays, so the read-only SQL produced
+# by txt_to_sql runs locally instead of round-tripping to Cloud SQL. Queries
+# outside the supported subset raise UnsupportedQuery and go to Postgres.
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "csv_tables")
+
+# CSV header -> column name advertised to the SQL agent in txt_to_sql
+PROPERTIES_COLUMNS = {
+    "Property_id": "property_id",
+    "Property_Name": "property_name",
+    "Property_Address": "property_address",
+    "Metro_Area": "metro_area",
+    "Square_Foot (SF)": "square_foot_sf",
+    "Property_Type": "property_type",
+}
+FINANCIALS_COLUMNS = {
+    "Id": "id",
+    "Property_id": "property_id",
+    "Year": "year",
+    "Revenue": "revenue",
+    "Net_Income ($)": "net_income_usd",
+}
+# INTEGER columns load as int64, NUMERIC as float64, everything else as text
+COLUMN_TYPES = {
+    "id": np.int64,
+    "property_id": np.int64,
+    "year": np.int64,
+    "square_foot_sf": np.float64,
+    "revenue": np.float64,
+    "net_income_usd": np.float64,
+}
+
+# Aggregates shared with the materialized views created by ingest_structured_data,
+# so the local engine and Postgres expose the same precomputed tables
+AGGREGATE_VIEWS = {
+    "financials_by_year": """
+    SELECT year,
+           COUNT(*) AS property_count,
+           SUM(revenue) AS total_revenue,
+           AVG(revenue) AS avg_revenue,
+           SUM(net_income_usd) AS total_net_income_usd,
+           AVG(net_income_usd) AS avg_net_income_usd
+    FROM public.financials
+    GROUP BY year
+    """,
+    "financials_by_metro": """
+    SELECT p.metro_area,
+           f.year,
+           COUNT(DISTINCT p.property_id) AS property_count,
+           SUM(p.square_foot_sf) AS total_square_foot_sf,
+           SUM(f.revenue) AS total_revenue,
+           SUM(f.net_income_usd) AS total_net_income_usd
+    FROM public.properties AS p
+    JOIN public.financials AS f
+        ON p.property_id = f.property_id
+    GROUP BY p.metro_area, f.year
+    """,
+}
+
+# Columns with a precomputed descending order for top-N questions
+RANKED_COLUMNS = ["revenue", "net_income_usd"]
+
+AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX"}
+KEYWORDS = {
+    "SELECT", "DISTINCT", "FROM", "AS", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS",
+    "ON", "WHERE", "GROUP", "BY", "HAVING", "ORDER", "ASC", "DESC", "LIMIT", "OFFSET",
+    "AND", "OR", "NOT", "IN", "LIKE", "ILIKE", "BETWEEN", "IS", "NULL", "UNION",
+}
+COMPARISONS = {
+    "=": operator.eq, "!=": operator.ne, "<>": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+class UnsupportedQuery(Exception):
+    pass
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<str>'(?:[^']|'')*')
+  | (?P<num>\d+(?:\.\d+)?)
+  | (?P<name>(?:"[^"]+"|[A-Za-z_][A-Za-z0-9_]*)(?:\.(?:"[^"]+"|[A-Za-z_][A-Za-z0-9_]*|\*))*)
+  | (?P<op><>|!=|<=|>=|[=<>(),;*-])
+""", re.VERBOSE)
+
+def tokenize(sql: str) -> list:
+    tokens, pos = [], 0
+    while pos < len(sql):
+        match = _TOKEN_RE.match(sql, pos)
+        if not match:
+            raise UnsupportedQuery(f"Unexpected character {sql[pos]!r}")
+        pos = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+def _ident(part: str) -> str:
+    # Quoted identifiers keep their case, bare ones fold to lower case like Postgres
+    return part[1:-1] if part.startswith('"') else part.lower()
+
+class _Parser:
+    # Recursive-descent parser for the single-SELECT subset txt_to_sql produces
+
+    def __init__(self, sql: str):
+        self.tokens = tokenize(sql)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        idx = self.pos + offset
+        return self.tokens[idx] if idx < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise UnsupportedQuery("Unexpected end of query")
+        self.pos += 1
+        return token
+
+    def is_keyword(self, word, offset=0):
+        kind, value = self.peek(offset)
+        return kind == "name" and value.upper() == word
+
+    def accept(self, word):
+        if self.is_keyword(word) or self.peek() == ("op", word):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, word):
+        if not self.accept(word):
+            raise UnsupportedQuery(f"Expected {word} near {self.peek()[1]!r}")
+
+    def parse(self) -> dict:
+        self.expect("SELECT")
+        plan = {"distinct": self.accept("DISTINCT"), "where": None, "group_by": [], "order_by": [], "limit": None}
+        plan["select"] = self.parse_select_list()
+        self.expect("FROM")
+        plan["tables"] = [self.parse_table()]
+        plan["join"] = None
+        if self.is_keyword("INNER") or self.is_keyword("JOIN"):
+            self.accept("INNER")
+            self.expect("JOIN")
+            plan["tables"].append(self.parse_table())
+            self.expect("ON")
+            left = self.parse_expr()
+            self.expect("=")
+            right = self.parse_expr()
+            if left[0] != "col" or right[0] != "col":
+                raise UnsupportedQuery("Join condition must compare two columns")
+            plan["join"] = (left, right)
+        if self.accept("WHERE"):
+            plan["where"] = self.parse_or()
+        if self.accept("GROUP"):
+            self.expect("BY")
+            plan["group_by"] = self.parse_list(self.parse_expr)
+        if self.accept("ORDER"):
+            self.expect("BY")
+            plan["order_by"] = self.parse_list(self.parse_order_key)
+        if self.accept("LIMIT"):
+            kind, value = self.next()
+            if kind != "num" or "." in value:
+                raise UnsupportedQuery("LIMIT must be an integer")
+            plan["limit"] = int(value)
+        self.accept(";")
+        if self.peek()[0] is not None:
+            raise UnsupportedQuery(f"Unsupported clause near {self.peek()[1]!r}")
+        return plan
+
+    def parse_list(self, parse_item):
+        items = [parse_item()]
+        while self.accept(","):
+            items.append(parse_item())
+        return items
+
+    def parse_select_list(self):
+        def parse_item():
+            expr = self.parse_expr()
+            alias = None
+            if self.accept("AS"):
+                alias = _ident(self.next()[1])
+            elif self.peek()[0] == "name" and self.peek()[1].upper() not in KEYWORDS:
+                alias = _ident(self.next()[1])
+            return expr, alias
+        return self.parse_list(parse_item)
+
+    def parse_table(self):
+        kind, value = self.next()
+        if kind != "name":
+            raise UnsupportedQuery("Subqueries are not supported")
+        parts = [_ident(p) for p in value.split(".")]
+        if len(parts) > 2 or (len(parts) == 2 and parts[0] != "public"):
+            raise UnsupportedQuery(f"Unknown table {value}")
+        alias = parts[-1]
+        if self.accept("AS"):
+            alias = _ident(self.next()[1])
+        elif self.peek()[0] == "name" and self.peek()[1].upper() not in KEYWORDS:
+            alias = _ident(self.next()[1])
+        return parts[-1], alias
+
+    def parse_order_key(self):
+        expr = self.parse_expr()
+        desc = False
+        if self.accept("DESC"):
+            desc = True
+        else:
+            self.accept("ASC")
+        if self.is_keyword("NULLS"):
+            raise UnsupportedQuery("NULLS FIRST/LAST is not supported")
+        return expr, desc
+
+    def parse_expr(self):
+        kind, value = self.peek()
+        if kind == "name" and self.peek(1) == ("op", "("):
+            func = value.upper()
+            if func not in AGGREGATES:
+                raise UnsupportedQuery(f"Function {value} is not supported")
+            self.pos += 2
+            distinct = self.accept("DISTINCT")
+            if self.accept("*"):
+                if func != "COUNT":
+                    raise UnsupportedQuery(f"{func}(*) is not valid")
+                arg = None
+            else:
+                arg = self.parse_expr()
+                if arg[0] != "col":
+                    raise UnsupportedQuery("Aggregates only take a column")
+            self.expect(")")
+            return ("agg", func, distinct, arg)
+        if kind == "name" and value.upper() not in KEYWORDS:
+            self.pos += 1
+            parts = value.split(".")
+            if parts[-1] == "*":
+                return ("star", _ident(parts[-2]) if len(parts) > 1 else None)
+            qualifier = _ident(parts[-2]) if len(parts) > 1 else None
+            return ("col", qualifier, _ident(parts[-1]))
+        if self.accept("*"):
+            return ("star", None)
+        if kind in ("num", "str") or (kind, value) == ("op", "-"):
+            return ("lit", self.parse_literal())
+        raise UnsupportedQuery(f"Unsupported expression near {value!r}")
+
+    def parse_literal(self):
+        negative = self.accept("-")
+        kind, value = self.next()
+        if kind == "num":
+            number = float(value) if "." in value else int(value)
+            return -number if negative else number
+        if kind == "str" and not negative:
+            return value[1:-1].replace("''", "'")
+        raise UnsupportedQuery(f"Expected a literal near {value!r}")
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.accept("OR"):
+            terms.append(self.parse_and())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.accept("AND"):
+            terms.append(self.parse_not())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def parse_not(self):
+        if self.accept("NOT"):
+            return ("not", self.parse_not())
+        if self.accept("("):
+            cond = self.parse_or()
+            self.expect(")")
+            return cond
+        return self.parse_predicate()
+
+    def parse_predicate(self):
+        expr = self.parse_expr()
+        if expr[0] != "col":
+            raise UnsupportedQuery("Conditions must start with a column")
+        if self.accept("IS"):
+            negated = self.accept("NOT")
+            self.expect("NULL")
+            return ("null", expr, negated)
+        negated = self.accept("NOT")
+        if self.accept("IN"):
+            self.expect("(")
+            values = self.parse_list(self.parse_literal)
+            self.expect(")")
+            return ("in", expr, values, negated)
+        if self.accept("BETWEEN"):
+            low = self.parse_literal()
+            self.expect("AND")
+            return ("between", expr, low, self.parse_literal(), negated)
+        if self.is_keyword("LIKE") or self.is_keyword("ILIKE"):
+            insensitive = self.next()[1].upper() == "ILIKE"
+            pattern = self.parse_literal()
+            if not isinstance(pattern, str):
+                raise UnsupportedQuery("LIKE needs a string pattern")
+            return ("like", expr, pattern, insensitive, negated)
+        if negated:
+            raise UnsupportedQuery("Unsupported NOT condition")
+        kind, value = self.next()
+        if kind != "op" or value not in COMPARISONS:
+            raise UnsupportedQuery(f"Unsupported operator {value!r}")
+        return ("cmp", value, expr, self.parse_literal())
+
+def parse_sql(sql: str) -> dict:
+    return _Parser(sql).parse()
+
+def _py(value):
+    # NumPy scalars -> plain Python values, matching what run_sql_query returns
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+def _has_agg(expr) -> bool:
+    return expr[0] == "agg"
+
+def _sort_key(value):
+    # Postgres puts NULLs last ascending and first descending
+    return (True,) if value is None else (False, value)
+
+def _to_array(values: list) -> np.ndarray:
+    if any(isinstance(v, str) for v in values):
+        return np.array(values, dtype=object)
+    return np.array(values)
+
+def load_csv_columns(path: str, column_map: dict) -> dict:
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    columns = {}
+    for src, col in column_map.items():
+        values = [row[src].strip() for row in rows]
+        dtype = COLUMN_TYPES.get(col)
+        columns[col] = np.array(values, dtype=dtype) if dtype else np.array(values, dtype=object)
+    return columns
+
+class StructuredEngine:
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.tables = {
+            "properties": load_csv_columns(os.path.join(data_dir, "properties.csv"), PROPERTIES_COLUMNS),
+            "financials": load_csv_columns(os.path.join(data_dir, "financials.csv"), FINANCIALS_COLUMNS),
+        }
+        self._build_join_index()
+        self._build_rankings()
+        # Precomputed group-by tables, queried exactly like the Postgres materialized views
+        for name, sql in AGGREGATE_VIEWS.items():
+            plan = parse_sql(sql)
+            rows = self.run_plan(plan)
+            cols = [alias or self._default_name(expr) for expr, alias in plan["select"]]
+            self.tables[name] = {col: _to_array([row[col] for row in rows]) for col in cols}
+
+    def _build_join_index(self):
+        # Row positions of properties JOIN financials ON property_id, one pair per matched financials row
+        prop_ids = self.tables["properties"]["property_id"]
+        fin_ids = self.tables["financials"]["property_id"]
+        order = np.argsort(prop_ids, kind="stable")
+        pos = np.searchsorted(prop_ids[order], fin_ids).clip(0, len(prop_ids) - 1)
+        matched = prop_ids[order][pos] == fin_ids
+        self.join_financials = np.nonzero(matched)[0]
+        self.join_properties = order[pos[matched]]
+        self.join_position = np.full(len(fin_ids), -1)
+        self.join_position[self.join_financials] = np.arange(len(self.join_financials))
+
+    def _build_rankings(self):
+        # Descending order of financials rows per metric, in both row spaces, for top-N scans
+        self.rankings = {}
+        for col in RANKED_COLUMNS:
+            rank = np.argsort(-self.tables["financials"][col], kind="stable")
+            joined = self.join_position[rank]
+            self.rankings[col] = {"single": rank, "join": joined[joined >= 0]}
+
+    def execute(self, sql: str) -> list:
+        return self.run_plan(parse_sql(sql))
+
+    def run_plan(self, plan: dict) -> list:
+        frame = self._bind(plan)
+        mask = self._eval_cond(plan["where"], frame) if plan["where"] else np.ones(frame["rows"], dtype=bool)
+        select = self._expand_select(plan["select"], frame)
+        order_by = [(self._resolve_order(expr, select), desc) for expr, desc in plan["order_by"]]
+        grouped = plan["group_by"] or any(_has_agg(e) for e, _ in select) or any(_has_agg(e) for e, _ in order_by)
+        if grouped:
+            rows = self._run_grouped(plan, frame, mask, select, order_by)
+        else:
+            rows = self._run_rows(frame, mask, select, order_by)
+
+        names = [alias or self._default_name(expr) for expr, alias in select]
+        output, seen = [], set()
+        for row in rows:
+            if plan["limit"] is not None and len(output) >= plan["limit"]:
+                break
+            if plan["distinct"]:
+                if row in seen:
+                    continue
+                seen.add(row)
+            output.append(dict(zip(names, row)))
+        return output
+
+    def _bind(self, plan: dict) -> dict:
+        tables = plan["tables"]
+        for table, _ in tables:
+            if table not in self.tables:
+                raise UnsupportedQuery(f"Unknown table {table}")
+        if len(tables) == 1:
+            table, alias = tables[0]
+            n = len(next(iter(self.tables[table].values())))
+            return {"aliases": {alias: (table, np.arange(n))}, "order": [alias], "rows": n, "space": "single"}
+
+        aliases = {alias: table for table, alias in tables}
+        left, right = plan["join"]
+        # Each side must be qualified with a different alias: one properties, one financials
+        joined = {aliases.get(left[1]), aliases.get(right[1])}
+        if (len(aliases) != 2 or left[1] == right[1] or joined != {"properties", "financials"}
+                or left[2] != "property_id" or right[2] != "property_id"):
+            raise UnsupportedQuery("Only properties JOIN financials ON property_id is supported")
+        positions = {"properties": self.join_properties, "financials": self.join_financials}
+        return {
+            "aliases": {alias: (table, positions[table]) for table, alias in tables},
+            "order": [alias for _, alias in tables],
+            "rows": len(self.join_financials),
+            "space": "join",
+        }
+
+    def _column(self, expr, frame) -> np.ndarray:
+        _, qualifier, name = expr
+        if qualifier is not None:
+            if qualifier not in frame["aliases"]:
+                raise UnsupportedQuery(f"Unknown table alias {qualifier}")
+            candidates = [qualifier]
+        else:
+            candidates = [a for a in frame["order"] if name in self.tables[frame["aliases"][a][0]]]
+            if len(candidates) > 1:
+                raise UnsupportedQuery(f"Column reference {name} is ambiguous")
+        for alias in candidates:
+            table, positions = frame["aliases"][alias]
+            if name in self.tables[table]:
+                return self.tables[table][name][positions]
+        raise UnsupportedQuery(f"Unknown column {name}")
+
+    def _source(self, expr, frame):
+        # (table, column) a column reference resolves to, used for precomputed rankings
+        _, qualifier, name = expr
+        self._column(expr, frame)
+        aliases = [qualifier] if qualifier else frame["order"]
+        for alias in aliases:
+            table = frame["aliases"].get(alias, (None,))[0]
+            if table and name in self.tables[table]:
+                return table, name
+        return None, name
+
+    def _require_numeric(self, expr, frame):
+        # Text ordering follows the database collation (e.g. en_US.UTF-8), not Python's
+        # code point order, so text sorts, MIN/MAX and range comparisons go to Postgres
+        if expr[0] == "agg":
+            if expr[3] is None or expr[1] == "COUNT":
+                return
+            expr = expr[3]
+        if self._column(expr, frame).dtype == object:
+            raise UnsupportedQuery(f"Ordering text column {expr[2]} depends on the database collation")
+
+    def _expand_select(self, select, frame):
+        items = []
+        for expr, alias in select:
+            if expr[0] != "star":
+                items.append((expr, alias))
+                continue
+            aliases = [expr[1]] if expr[1] else frame["order"]
+            for a in aliases:
+                if a not in frame["aliases"]:
+                    raise UnsupportedQuery(f"Unknown table alias {a}")
+                items.extend((("col", a, col), None) for col in self.tables[frame["aliases"][a][0]])
+        return items
+
+    def _resolve_order(self, expr, select):
+        # ORDER BY may name a select position or output alias as well as an expression
+        if expr[0] == "lit" and isinstance(expr[1], int) and 1 <= expr[1] <= len(select):
+            return select[expr[1] - 1][0]
+        if expr[0] == "col" and expr[1] is None:
+            for item, alias in select:
+                if alias == expr[2]:
+                    return item
+        if expr[0] == "lit":
+            raise UnsupportedQuery("Unsupported ORDER BY expression")
+        return expr
+
+    def _default_name(self, expr) -> str:
+        if expr[0] == "col":
+            return expr[2]
+        if expr[0] == "agg":
+            return expr[1].lower()
+        return "?column?"
+
+    def _eval_cond(self, cond, frame) -> np.ndarray:
+        kind = cond[0]
+        if kind == "and":
+            return np.logical_and.reduce([self._eval_cond(c, frame) for c in cond[1]])
+        if kind == "or":
+            return np.logical_or.reduce([self._eval_cond(c, frame) for c in cond[1]])
+        if kind == "not":
+            return ~self._eval_cond(cond[1], frame)
+
+        values = self._column(cond[1] if kind != "cmp" else cond[2], frame)
+        numeric = values.dtype != object
+        if kind == "null":
+            isnull = np.isnan(values) if numeric else np.array([v is None for v in values], dtype=bool)
+            return ~isnull if cond[2] else isnull
+        if kind == "like":
+            _, _, pattern, insensitive, negated = cond
+            regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+            matcher = re.compile(regex, re.IGNORECASE | re.DOTALL if insensitive else re.DOTALL)
+            result = np.array([v is not None and bool(matcher.fullmatch(str(v))) for v in values], dtype=bool)
+            return ~result if negated else result
+        if kind == "in":
+            literals = [self._coerce(v, numeric) for v in cond[2]]
+            result = np.array([v in literals for v in values.tolist()], dtype=bool)
+            return ~result if cond[3] else result
+        if kind == "between":
+            self._require_numeric(cond[1], frame)
+            low, high = self._coerce(cond[2], numeric), self._coerce(cond[3], numeric)
+            result = np.array([v is not None and low <= v <= high for v in values.tolist()], dtype=bool)
+            return ~result if cond[4] else result
+        if cond[1] not in ("=", "!=", "<>"):
+            self._require_numeric(cond[2], frame)
+        literal = self._coerce(cond[3], numeric)
+        compare = COMPARISONS[cond[1]]
+        return np.array([v is not None and compare(v, literal) for v in values.tolist()], dtype=bool)
+
+    def _coerce(self, literal, numeric):
+        # Postgres casts '2023' to an integer for numeric columns; text columns need text literals
+        if numeric:
+            if isinstance(literal, str):
+                try:
+                    return float(literal)
+                except ValueError:
+                    raise UnsupportedQuery(f"Cannot compare {literal!r} with a numeric column")
+            return literal
+        if not isinstance(literal, str):
+            raise UnsupportedQuery("Cannot compare a number with a text column")
+        return literal
+
+    def _run_rows(self, frame, mask, select, order_by):
+        for expr, _ in select:
+            if expr[0] != "col":
+                raise UnsupportedQuery("Only columns and aggregates can be selected")
+        positions = np.nonzero(mask)[0]
+        if order_by:
+            positions = self._order_rows(frame, mask, positions, order_by)
+        columns = [self._column(expr, frame) for expr, _ in select]
+        return (tuple(_py(col[i]) for col in columns) for i in positions)
+
+    def _order_rows(self, frame, mask, positions, order_by):
+        first, desc = order_by[0]
+        table, name = self._source(first, frame) if first[0] == "col" else (None, None)
+        if len(order_by) == 1 and desc and table == "financials" and name in self.rankings:
+            # Top-N by revenue/net income: walk the precomputed descending order
+            ranked = self.rankings[name][frame["space"]]
+            return ranked[mask[ranked]]
+        positions = positions.tolist()
+        for expr, desc in reversed(order_by):
+            if expr[0] != "col":
+                raise UnsupportedQuery("Unsupported ORDER BY expression")
+            self._require_numeric(expr, frame)
+            values = self._column(expr, frame)
+            positions.sort(key=lambda i: _sort_key(_py(values[i])), reverse=desc)
+        return positions
+
+    def _run_grouped(self, plan, frame, mask, select, order_by):
+        positions = np.nonzero(mask)[0]
+        group_exprs = []
+        for expr in plan["group_by"]:
+            expr = self._resolve_order(expr, select)
+            if expr[0] != "col":
+                raise UnsupportedQuery("GROUP BY must name columns")
+            group_exprs.append(expr)
+        group_cols = [self._column(expr, frame) for expr in group_exprs]
+        group_sources = [self._source(expr, frame) for expr in group_exprs]
+
+        groups = {}
+        for i in positions:
+            key = tuple(_py(col[i]) for col in group_cols)
+            groups.setdefault(key, []).append(i)
+        if not group_exprs and not groups:
+            groups[()] = []
+
+        def evaluate(expr, members):
+            if expr[0] == "agg":
+                return self._aggregate(expr, frame, members)
+            if expr[0] == "col" and self._source(expr, frame) in group_sources:
+                return _py(self._column(expr, frame)[members[0]])
+            raise UnsupportedQuery(f"Column {expr[-1]} must appear in GROUP BY")
+
+        for expr, _ in order_by:
+            self._require_numeric(expr, frame)
+        rows = []
+        for members in groups.values():
+            members = np.array(members, dtype=int)
+            row = tuple(evaluate(expr, members) for expr, _ in select)
+            keys = tuple(evaluate(expr, members) for expr, _ in order_by)
+            rows.append((row, keys))
+        for idx in reversed(range(len(order_by))):
+            rows.sort(key=lambda r: _sort_key(r[1][idx]), reverse=order_by[idx][1])
+        return [row for row, _ in rows]
+
+    def _aggregate(self, expr, frame, members):
+        _, func, distinct, arg = expr
+        if arg is None:
+            return len(members)
+        self._require_numeric(expr, frame)
+        values = [_py(v) for v in self._column(arg, frame)[members]]
+        values = [v for v in values if v is not None and not (isinstance(v, float) and np.isnan(v))]
+        if distinct:
+            values = list(dict.fromkeys(values))
+        if func == "COUNT":
+            return len(values)
+        if not values:
+            return None
+        if func == "SUM":
+            return sum(values)
+        if func == "AVG":
+            return sum(values) / len(values)
+        return min(values) if func == "MIN" else max(values)
+
+@lru_cache(maxsize=None)
+def get_engine() -> StructuredEngine:
+    return StructuredEngine()
+
+def _normalize_rows(rows, ordered=False) -> list:
+    # Type-tolerant form for comparing local and Postgres results; order-insensitive
+    # unless the query has ORDER BY
+    normalized = []
+    for row in rows:
+        items = []
+        for col, value in row.items():
+            if value is not None and not isinstance(value, str):
+                value = round(float(value), 6)
+            items.append((col, value))
+        normalized.append(tuple(sorted(items, key=lambda item: item[0])))
+    return normalized if ordered else sorted(normalized, key=repr)
+
+def results_match(local, remote, ordered=False) -> bool:
+    if isinstance(remote, dict):
+        return False
+    return _normalize_rows(local, ordered) == _normalize_rows(remote, ordered)
+
+def run_structured_query(sql: str):
+    # STRUCTURED_ENGINE_MODE: local (default), verify (compare with Postgres) or postgres.
+    # db_connector is imported only when Postgres is needed, so local mode runs offline.
+    mode = os.getenv("STRUCTURED_ENGINE_MODE", "local").lower()
+    if mode == "postgres":
+        from db.db_connector import run_sql_query
+        return run_sql_query(sql)
+    try:
+        plan = parse_sql(sql)
+        results = get_engine().run_plan(plan)
+    except Exception as e:
+        print(f"Structured engine falling back to Postgres: {e}")
+        from db.db_connector import run_sql_query
+        return run_sql_query(sql)
+
+    if mode == "verify":
+        from db.db_connector import run_sql_query
+        remote = run_sql_query(sql)
+        # ORDER BY results are compared row by row so ranking bugs are caught too
+        if not results_match(results, remote, ordered=bool(plan["order_by"])):
+            print(f"Structured engine mismatch for query:\n{sql}\nlocal={results}\npostgres={remote}")
+            return remote
+    return results
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
+from agent_files.single_flight import invoke_llm
 
 load_dotenv()
 
@@ -32,11 +33,32 @@ def generate_sql_from_prompt(user_question: str) -> str:
             net_income_usd NUMERIC
             )
 
+            Materialized view public.financials_by_year(
+            year INTEGER,
+            property_count INTEGER,
+            total_revenue NUMERIC,
+            avg_revenue NUMERIC,
+            total_net_income_usd NUMERIC,
+            avg_net_income_usd NUMERIC
+            )
+
+            Materialized view public.financials_by_metro(
+            metro_area TEXT,
+            year INTEGER,
+            property_count INTEGER,
+            total_square_foot_sf NUMERIC,
+            total_revenue NUMERIC,
+            total_net_income_usd NUMERIC
+            )
+
             IMPORTANT: Use these EXACT column names (no quotes needed):
             - square_foot_sf (not "Square_Foot (SF)")
             - net_income_usd (not "Net_Income ($)")
             - property_name, property_address, metro_area, property_type
             - revenue, year, property_id
+            - For totals or averages per year or per metro area, prefer the
+              financials_by_year and financials_by_metro views over aggregating
+              the base tables
 
             Example:
             -- question: List the top 5 properties by revenue in 2023
@@ -48,6 +70,12 @@ def generate_sql_from_prompt(user_question: str) -> str:
             ORDER BY f.revenue DESC
             LIMIT 5;
 
+            Example:
+            -- question: What was the total revenue in Dallas in 2024?
+            SELECT total_revenue
+            FROM public.financials_by_metro
+            WHERE metro_area = 'Dallas' AND year = 2024;
+
             Example:
             -- question: How many properties do we have?
             SELECT COUNT(*) as total_properties
@@ -64,7 +92,7 @@ def generate_sql_from_prompt(user_question: str) -> str:
             -- SQL:
             """
 
-        response = llm.invoke(prompt)
+        response = invoke_llm(llm, prompt)
         sql = response.content.strip()
         if sql.startswith("```"):
             sql = "\n".join(sql.splitlines()[1:])
@@ -14,6 +14,7 @@ from google.cloud.sql.connector import Connector
 from sqlalchemy import create_engine, text
 from db.db_connector import run_sql_query
 from agent_files.sql_agent import generate_sql_response
+from agent_files.single_flight import question_flight, embedding_flight, normalize_question, invoke_llm
 
 load_dotenv()
 
@@ -70,7 +71,7 @@ engine, emb_pr, emb_sec, llm = init_clients()
 
 # Search press releases (768-dim)
 def search_press_releases(query, limit=20):
-    embeddings = emb_pr.get_embeddings([query])
+    embeddings = embedding_flight.do(("text-embedding-004", query), emb_pr.get_embeddings, [query])
     press_qr_vec = embeddings[0].values       
     press_vec_str = '[' + ','.join(map(str, press_qr_vec)) + ']'
 
@@ -86,15 +87,40 @@ def search_press_releases(query, limit=20):
         return [], "press_releases"
     return press_res, "press_releases"
 
-# Search SEC reports (1536-dim)
-def search_sec_reports(query, limit=10):
-    sec_qr_vec = emb_sec.embed_query(
+# Search SEC reports (1536-dim): match section chunks, return their deduplicated parent sections
+def search_sec_reports(query, limit=3, chunk_limit=12):
+    sec_qr_vec = embedding_flight.do(
+        ("gemini-embedding-001", query),
+        emb_sec.embed_query,
         query,
         output_dimensionality=1536,
         task_type="RETRIEVAL_DOCUMENT"
         )        
     sec_vec_str = '[' + ','.join(map(str, sec_qr_vec)) + ']'
 
+    sql = f"""
+        WITH hits AS (
+            SELECT section_id, embedding <=> '{sec_vec_str}'::vector AS distance
+            FROM sec_section_chunks
+            ORDER BY embedding <=> '{sec_vec_str}'::vector
+            LIMIT {chunk_limit}
+        )
+        SELECT s.source_file, s.page, s.section, s.content, MIN(h.distance) AS distance
+        FROM hits AS h
+        JOIN sec_sections AS s ON s.id = h.section_id
+        WHERE 1 - h.distance > 0.02
+        GROUP BY s.id, s.source_file, s.page, s.section, s.content
+        ORDER BY distance
+        LIMIT {limit}
+        """
+    sec_results = run_sql_query(sql)
+    # Missing or empty section tables (e.g. an interrupted ingest) fall back to the page chunks
+    if not sec_results or (isinstance(sec_results, dict) and "error" in sec_results):
+        return search_sec_pages(sec_vec_str), "sec_reports"
+    return sec_results, "sec_reports"
+
+# Page-split SEC chunks, used until the section tables have been ingested
+def search_sec_pages(sec_vec_str, limit=10):
     sql = f"""
         SELECT source_file, page, content
         FROM sec_reports
@@ -104,8 +130,8 @@ def search_sec_reports(query, limit=10):
         """
     sec_results = run_sql_query(sql)
     if isinstance(sec_results, dict) and "error" in sec_results:
-        return [], "sec_reports"
-    return sec_results, "sec_reports"
+        return []
+    return sec_results
 
 # Search structured data
 def query_structured_data(query):
@@ -132,7 +158,7 @@ def det_int_vertexai(query):
     Your response (one word only):
     """
     try:
-        response = llm.invoke(routing_prompt)
+        response = invoke_llm(llm, routing_prompt)
         intent = response.content.strip().lower()
         # For Recent Quarterly Data
         query_lower = query.lower()
@@ -187,11 +213,35 @@ def generate_answer(query, context, source_type):
     Provide a clear, concise answer in plain English.
     """
     try:
-        response = llm.invoke(prompt)
+        response = invoke_llm(llm, prompt)
         return response.content
     except Exception as e:
         return f"Sorry, I encountered an error: {str(e)}"
 
+# Full pipeline for one question: routing, retrieval and generation
+def answer_question(query):
+    intent = det_int_vertexai(query)
+    if intent == "press_releases":
+        results, source = search_press_releases(query)
+        if results:
+            context = "\n\n".join([r.get('content', '') for r in results if isinstance(r, dict) and r.get('content')])
+            answer = generate_answer(query, context, "Press Releases")
+        else:
+            answer = "No relevant press releases found."
+
+    elif intent == "sec_reports":
+        results, source = search_sec_reports(query)
+        if results:
+            context = "\n\n".join([str(r.get('content', '')) for r in results])
+            answer = generate_answer(query, context, "SEC Reports")
+        else:
+            answer = "No relevant SEC reports found."
+
+    else:
+        answer, source = query_structured_data(query)
+
+    return intent, answer
+
 st.set_page_config(
     page_title="Prologis Financial Assistant Chatbot",
     layout="wide"
@@ -230,26 +280,8 @@ if prompt := st.chat_input("Ask about Prologis..."):
 
     with st.chat_message("assistant"):
         with st.spinner("Analyzing with Vertex AI..."):
-            intent = det_int_vertexai(prompt)
-            if intent == "press_releases":
-                results, source = search_press_releases(prompt)
-                if results:
-                    context = "\n\n".join([r.get('content', '') for r in results if isinstance(r, dict) and r.get('content')])
-                    answer = generate_answer(prompt, context, "Press Releases")
-                else:
-                    answer = "No relevant press releases found."
-
-            elif intent == "sec_reports":
-                results, source = search_sec_reports(prompt)
-                if results:
-                    context = "\n\n".join([str(r.get('content', '')) for r in results])
-                    answer = generate_answer(prompt, context, "SEC Reports")
-                else:
-                    answer = "No relevant SEC reports found."
-
-            else:
-                answer, source = query_structured_data(prompt)
-
+            # Identical questions in flight across sessions share one pipeline run
+            intent, answer = question_flight.do(normalize_question(prompt), answer_question, prompt)
             st.markdown(answer)
             st.caption(f"Vertex AI Routing: {intent}")
             st.session_state.messages.append({
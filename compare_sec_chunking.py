@@ -0,0 +1,194 @@
+import os
+import re
+import json
+import math
+import argparse
+from collections import Counter
+import numpy as np
+from dotenv import load_dotenv
+from langchain_community.document_loaders import PyPDFLoader
+from agent_files.sec_chunker import page_chunks, section_chunks
+
+# Compares the old per-page splitter with section-aware chunking on the SEC PDFs:
+# rows to embed, stored size, and (with a questions file) retrieval hit-rate.
+# Sizes computed from the chunks are estimates of raw text and vector bytes only;
+# --measure-db reports the real table and index sizes from Cloud SQL.
+#
+#   python compare_sec_chunking.py --questions data/sec_eval.jsonl --measure-db
+#
+# Each line of the questions file is {"question": "...", "expected": "snippet" or ["snippet", ...]};
+# a question is a hit when any snippet appears in the context the chatbot would send to the LLM.
+
+load_dotenv()
+
+EMBEDDING_DIM = 1536
+VECTOR_BYTES = 4 * EMBEDDING_DIM + 8     # pgvector storage per row: float4 values plus header
+
+# Tables holding each strategy's rows, for --measure-db
+STRATEGY_TABLES = {
+    "page_split": ["sec_reports"],
+    "section_aware": ["sec_sections", "sec_section_chunks"],
+}
+
+# Mirrors the search_sec_reports / search_sec_pages defaults in app.py
+PAGE_LIMIT = 10
+SECTION_CHUNK_LIMIT = 12
+SECTION_LIMIT = 3
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def tokenize(text: str) -> list:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+class TfidfRetriever:
+    # Offline stand-in for the embedding model, so the comparison runs without API calls
+    def __init__(self, texts):
+        self.docs = [Counter(tokenize(t)) for t in texts]
+        df = Counter(term for doc in self.docs for term in doc)
+        self.idf = {term: math.log(len(self.docs) / n) + 1 for term, n in df.items()}
+        self.norms = [math.sqrt(sum((tf * self.idf[t]) ** 2 for t, tf in doc.items())) or 1.0 for doc in self.docs]
+
+    def search(self, query: str, k: int) -> list:
+        terms = Counter(tokenize(query))
+        scores = np.array([
+            sum(tf * qtf * self.idf[t] ** 2 for t, qtf in terms.items() if (tf := doc.get(t)))
+            / norm for doc, norm in zip(self.docs, self.norms)
+        ])
+        return list(np.argsort(-scores, kind="stable")[:k])
+
+class EmbeddingRetriever:
+    # Same model, dimensionality and task type as ingest_sec_vertexai and app.py
+    def __init__(self, texts):
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        self.embedder = GoogleGenerativeAIEmbeddings(
+            model="gemini-embedding-001",
+            google_api_key=os.getenv("GOOGLE_API_KEY")
+        )
+        vectors = self.embedder.embed_documents(
+            texts,
+            output_dimensionality=EMBEDDING_DIM,
+            task_type="RETRIEVAL_DOCUMENT"
+        )
+        self.matrix = self._unit(np.array(vectors, dtype=np.float32))
+
+    @staticmethod
+    def _unit(matrix):
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def search(self, query: str, k: int) -> list:
+        vec = self.embedder.embed_query(
+            query,
+            output_dimensionality=EMBEDDING_DIM,
+            task_type="RETRIEVAL_DOCUMENT"
+        )
+        scores = self.matrix @ self._unit(np.array(vec, dtype=np.float32))
+        return list(np.argsort(-scores, kind="stable")[:k])
+
+def load_chunkings(data_dir: str):
+    pages, parents, children = [], [], []
+    pdf_files = sorted(f for f in os.listdir(data_dir) if f.lower().endswith(".pdf"))
+    for file_idx, fname in enumerate(pdf_files, 1):
+        print(f"Chunking {fname} ({file_idx}/{len(pdf_files)})")
+        docs = PyPDFLoader(os.path.join(data_dir, fname)).load()
+        pages.extend(page_chunks(docs, fname))
+        file_parents, file_children = section_chunks(docs, fname)
+        # Make parent_index unique across files
+        offset = len(parents)
+        parents.extend({**p, "parent_index": p["parent_index"] + offset} for p in file_parents)
+        children.extend({**c, "parent_index": c["parent_index"] + offset} for c in file_children)
+    return pages, parents, children
+
+def size_stats(rows: list, stored: list = ()) -> dict:
+    # Estimates only: no tuple/TOAST overhead and no HNSW graph
+    text_bytes = sum(len(r["content"].encode("utf-8")) for r in rows)
+    return {
+        "rows": len(rows),
+        "avg_chars": round(text_bytes / len(rows)) if rows else 0,
+        "est_text_mb": round((text_bytes + sum(len(r["content"].encode("utf-8")) for r in stored)) / 1e6, 2),
+        "est_vector_mb": round(len(rows) * VECTOR_BYTES / 1e6, 2),
+    }
+
+def measured_sizes(tables: list) -> dict:
+    # Real on-disk sizes of the ingested tables, including TOAST and every index
+    from db.db_connector import run_sql_query
+    names = ", ".join(f"'{t}'" for t in tables)
+    rows = run_sql_query(f"""
+        SELECT COALESCE(SUM(pg_relation_size(c.oid)), 0) AS table_bytes,
+               COALESCE(SUM(pg_indexes_size(c.oid)), 0) AS index_bytes,
+               COALESCE(SUM(pg_total_relation_size(c.oid)), 0) AS total_bytes,
+               COUNT(*) AS tables_found
+        FROM pg_class AS c
+        WHERE c.relname IN ({names}) AND c.relkind = 'r'
+        """)
+    if isinstance(rows, dict):
+        return {"db_error": rows.get("error")}
+    row = rows[0]
+    if row["tables_found"] != len(tables):
+        return {"db_error": f"expected tables {tables} not all present"}
+    return {
+        "db_table_mb": round(float(row["table_bytes"]) / 1e6, 2),
+        "db_index_mb": round(float(row["index_bytes"]) / 1e6, 2),
+        "db_total_mb": round(float(row["total_bytes"]) / 1e6, 2),
+    }
+
+def page_context(retriever, pages, question):
+    return [pages[i]["content"] for i in retriever.search(question, PAGE_LIMIT)]
+
+def section_context(retriever, parents, children, question):
+    # Top child chunks, collapsed to their parents in rank order
+    seen = []
+    for i in retriever.search(question, SECTION_CHUNK_LIMIT):
+        parent_index = children[i]["parent_index"]
+        if parent_index not in seen:
+            seen.append(parent_index)
+    return [parents[p]["content"] for p in seen[:SECTION_LIMIT]]
+
+def hit_rate(questions: list, contexts: list) -> dict:
+    hits = 0
+    for q, context in zip(questions, contexts):
+        expected = q["expected"] if isinstance(q["expected"], list) else [q["expected"]]
+        joined = normalize("\n\n".join(context))
+        hits += any(normalize(e) in joined for e in expected)
+    return {
+        "hit_rate": round(hits / len(questions), 3) if questions else None,
+        "avg_context_chars": round(sum(len("\n\n".join(c)) for c in contexts) / len(contexts)) if contexts else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare page-split and section-aware SEC chunking")
+    parser.add_argument("--data-dir", default="data", help="Directory containing the SEC PDFs")
+    parser.add_argument("--questions", help="JSONL file of questions with expected snippets")
+    parser.add_argument("--retriever", choices=["embeddings", "tfidf"], default="embeddings")
+    parser.add_argument("--measure-db", action="store_true", help="Report real table and index sizes from Cloud SQL")
+    args = parser.parse_args()
+
+    pages, parents, children = load_chunkings(args.data_dir)
+    results = {
+        "page_split": size_stats(pages),
+        "section_aware": {**size_stats(children, stored=parents), "parents": len(parents)},
+    }
+
+    if args.measure_db:
+        for name, tables in STRATEGY_TABLES.items():
+            results[name].update(measured_sizes(tables))
+
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            questions = [json.loads(line) for line in f if line.strip()]
+        retriever_cls = EmbeddingRetriever if args.retriever == "embeddings" else TfidfRetriever
+        page_retriever = retriever_cls([p["content"] for p in pages])
+        section_retriever = retriever_cls([c["content"] for c in children])
+        results["page_split"].update(hit_rate(
+            questions, [page_context(page_retriever, pages, q["question"]) for q in questions]))
+        results["section_aware"].update(hit_rate(
+            questions, [section_context(section_retriever, parents, children, q["question"]) for q in questions]))
+
+    for name, stats in results.items():
+        print(f"\n{name}")
+        for key, value in stats.items():
+            print(f"  {key:<18} {value}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from google.cloud.sql.connector import Connector
+from agent_files.single_flight import sql_flight
 # Load the .env variables
 load_dotenv()
 
@@ -16,6 +17,10 @@ if not all([INSTANCE_CONNECTION_NAME, DB_PASSWORD]):
     )
 
 def run_sql_query(query: str):
+    # Concurrent callers running the same SQL share one connection and round trip
+    return sql_flight.do(query, _run_sql_query, query)
+
+def _run_sql_query(query: str):
     try:
         connector = Connector()
         conn = connector.connect(
@@ -2,10 +2,10 @@ import os
 import time
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from google.cloud.sql.connector import Connector
 from sqlalchemy import create_engine, text
+from agent_files.sec_chunker import section_chunks
 
 if "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
     del os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
@@ -47,26 +47,41 @@ def getconn():
 engine = create_engine("postgresql+pg8000://", creator=getconn)
 
 load_pdf_kt = PyPDFLoader
-splitter_txt = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
 
-def clean_text(text: str) -> str:
-    return text.replace("\x00", " ").strip()
+# Parent sections are stored as plain text; only their child chunks are embedded
+schema_sql = [
+    """
+    CREATE TABLE IF NOT EXISTS sec_sections (
+        id SERIAL PRIMARY KEY,
+        source_file TEXT NOT NULL,
+        parent_index INTEGER NOT NULL,
+        section TEXT,
+        page INTEGER,
+        content TEXT NOT NULL,
+        UNIQUE (source_file, parent_index)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sec_section_chunks (
+        id SERIAL PRIMARY KEY,
+        section_id INTEGER NOT NULL REFERENCES sec_sections (id) ON DELETE CASCADE,
+        source_file TEXT NOT NULL,
+        page INTEGER,
+        chunk_index INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        embedding vector(1536)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS sec_section_chunks_embedding_idx ON sec_section_chunks USING hnsw (embedding vector_cosine_ops)",
+]
 
-def process_pdf(path: str) -> list[dict]:
+def process_pdf(path: str):
     docs = load_pdf_kt(path).load()
-    chunks = []
-    for doc in docs:
-        for idx, chunk in enumerate(splitter_txt.split_documents([doc])):
-            text = clean_text(chunk.page_content)
-            if not text:
-                continue
-            chunks.append({
-                "source_file": os.path.basename(path),
-                "page": doc.metadata.get("page"),
-                "chunk_index": idx,
-                "content": text
-            })
-    return chunks
+    return section_chunks(docs, os.path.basename(path))
+
+with engine.begin() as conn:
+    for stmt in schema_sql:
+        conn.execute(text(stmt))
 
 DATA_DIR = "data"     # The directory containing SEC PDF
 my_rec = []
@@ -77,8 +92,8 @@ total_files = len(pdf_files)
 for file_idx, fname in enumerate(pdf_files, 1):
     pdf_path = os.path.join(DATA_DIR, fname)
     print(f"Processing {fname} ({file_idx}/{total_files})")
-    chunks = process_pdf(pdf_path)
-    texts = [c["content"] for c in chunks]
+    parents, children = process_pdf(pdf_path)
+    texts = [c["content"] for c in children]
 
     # Generate embeddings with Google GenAI
     vectors = embedder.embed_documents(
@@ -86,38 +101,45 @@ for file_idx, fname in enumerate(pdf_files, 1):
         output_dimensionality=1536,
         task_type="RETRIEVAL_DOCUMENT"
     )
+    print(f"  {len(parents)} sections, {len(children)} chunks")
+    my_rec.append((fname, parents, [{**c, "embedding": emb} for c, emb in zip(children, vectors) if emb]))
 
-    for c, emb in zip(chunks, vectors):
-        if emb:
-            my_rec.append({**c, "embedding": emb})
-
-BATCH_SIZE = 20
+section_sql = """
+            INSERT INTO sec_sections (source_file, parent_index, section, page, content)
+            VALUES (:source_file, :parent_index, :section, :page, :content)
+            RETURNING id
+            """
 insert_sql = """
-            INSERT INTO sec_reports (source_file, page, chunk_index, content, embedding)
-            VALUES (:source_file, :page, :chunk_index, :content, :embedding)
+            INSERT INTO sec_section_chunks (section_id, source_file, page, chunk_index, content, embedding)
+            VALUES (:section_id, :source_file, :page, :chunk_index, :content, :embedding)
             """
-successful_batches = 0
-for i in range(0, len(my_rec), BATCH_SIZE):
-    batch = my_rec[i:i + BATCH_SIZE]
+successful_files = 0
+for fname, parents, records in my_rec:
     try:
+        # One transaction per filing so a rerun replaces it cleanly
         with engine.begin() as conn:
-            for record in batch:
+            conn.execute(text("DELETE FROM sec_sections WHERE source_file = :source_file"), {"source_file": fname})
+            section_ids = {}
+            for parent in parents:
+                section_ids[parent["parent_index"]] = conn.execute(text(section_sql), parent).scalar()
+            for record in records:
                 conn.execute(text(insert_sql), {
+                    "section_id": section_ids[record["parent_index"]],
                     "source_file": record["source_file"],
                     "page": record["page"],
                     "chunk_index": record["chunk_index"],
                     "content": record["content"],
                     "embedding": str(record["embedding"])
                 })
-        successful_batches += 1
+        successful_files += 1
     except Exception as e:
-        print(f"  Error with batch {i//BATCH_SIZE + 1}: {e}")
+        print(f"  Error with {fname}: {e}")
     time.sleep(0.2)
 
 with engine.connect() as conn:
-    result = conn.execute(text("SELECT COUNT(*) FROM sec_reports"))
-    count = result.scalar()
-    print(f"Final count: {count} records in database")
+    sections = conn.execute(text("SELECT COUNT(*) FROM sec_sections")).scalar()
+    count = conn.execute(text("SELECT COUNT(*) FROM sec_section_chunks")).scalar()
+    print(f"Final count: {sections} sections, {count} chunk records in database")
 
 connector.close()
-print("SEC PDFs Ingestion completed!")
\ No newline at end of file
+print("SEC PDFs Ingestion completed!")
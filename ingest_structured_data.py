@@ -0,0 +1,164 @@
+import os
+import io
+import csv
+from dotenv import load_dotenv
+from google.cloud.sql.connector import Connector
+from agent_files.structured_engine import PROPERTIES_COLUMNS, FINANCIALS_COLUMNS, AGGREGATE_VIEWS
+
+load_dotenv()
+INSTANCE_CONNECTION_NAME = os.getenv("CLOUD_SQL_CONNECTION_NAME")
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_NAME = os.getenv("DB_NAME", "prologis_db")
+
+if not all([INSTANCE_CONNECTION_NAME, DB_PASSWORD]):
+    raise ValueError("Missing CLOUD_SQL_CONNECTION_NAME or DB_PASSWORD in .env")
+
+DATA_DIR = os.path.join("data", "csv_tables")     # The directory containing the structured CSVs
+
+# Columns the loader and txt_to_sql expect; tables that differ (e.g. imported straight
+# from the CSVs with "Square_Foot (SF)" style names) are dropped and recreated
+EXPECTED_COLUMNS = {
+    "properties": [
+        ("property_id", "integer"), ("property_name", "text"), ("property_address", "text"),
+        ("metro_area", "text"), ("square_foot_sf", "numeric"), ("property_type", "text"),
+    ],
+    "financials": [
+        ("id", "integer"), ("property_id", "integer"), ("year", "integer"),
+        ("revenue", "numeric"), ("net_income_usd", "numeric"),
+    ],
+}
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS public.properties (
+        property_id INTEGER PRIMARY KEY,
+        property_name TEXT NOT NULL,
+        property_address TEXT,
+        metro_area TEXT,
+        square_foot_sf NUMERIC,
+        property_type TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.financials (
+        id INTEGER PRIMARY KEY,
+        property_id INTEGER NOT NULL REFERENCES public.properties (property_id),
+        year INTEGER NOT NULL,
+        revenue NUMERIC,
+        net_income_usd NUMERIC
+    )
+    """,
+]
+
+INDEX_SQL = [
+    # Joins and per-property lookups (one row per property and year, which
+    # financials_by_year.property_count relies on), year filters with revenue ranking, metro filters
+    "DROP INDEX IF EXISTS public.financials_property_id_year_idx",
+    "CREATE UNIQUE INDEX financials_property_id_year_idx ON public.financials (property_id, year)",
+    "CREATE INDEX IF NOT EXISTS financials_year_revenue_idx ON public.financials (year, revenue)",
+    "CREATE INDEX IF NOT EXISTS properties_metro_area_idx ON public.properties (metro_area)",
+]
+
+MATERIALIZED_VIEWS = [f"public.{view}" for view in AGGREGATE_VIEWS]
+
+# Precomputed aggregates for the most common question shapes, shared with the in-process
+# engine. They are dropped and recreated on every load so Postgres always runs the
+# current AGGREGATE_VIEWS definitions.
+DROP_VIEWS_SQL = [f"DROP MATERIALIZED VIEW IF EXISTS {view}" for view in MATERIALIZED_VIEWS]
+VIEWS_SQL = [
+    f"CREATE MATERIALIZED VIEW public.{view} AS {select_sql}"
+    for view, select_sql in AGGREGATE_VIEWS.items()
+] + [
+    "CREATE UNIQUE INDEX financials_by_year_idx ON public.financials_by_year (year)",
+    "CREATE UNIQUE INDEX financials_by_metro_idx ON public.financials_by_metro (metro_area, year)",
+]
+
+connector = Connector()
+def getconn():
+    return connector.connect(
+        INSTANCE_CONNECTION_NAME,
+        "pg8000",
+        user=DB_USER,
+        password=DB_PASSWORD,
+        db=DB_NAME
+    )
+
+def to_copy_buffer(path: str, column_map: dict) -> io.StringIO:
+    # Rewrite the CSV with schema column names so COPY can map by header order
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = set(column_map) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{os.path.basename(path)} is missing columns: {sorted(missing)}")
+        writer.writerow(column_map.values())
+        for row in reader:
+            writer.writerow([row[src].strip() for src in column_map])
+    buf.seek(0)
+    return buf
+
+def copy_table(cursor, table: str, path: str, column_map: dict):
+    cols = ", ".join(column_map.values())
+    cursor.execute(
+        f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+        stream=to_copy_buffer(path, column_map)
+    )
+    print(f"Loaded {cursor.rowcount} rows into {table}")
+
+def table_columns(cursor, table: str) -> list:
+    cursor.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position",
+        (table,)
+    )
+    return [tuple(row) for row in cursor.fetchall()]
+
+def ingest_structured_data(conn):
+    cursor = conn.cursor()
+    for stmt in DROP_VIEWS_SQL:
+        cursor.execute(stmt)
+
+    # Every load replaces all rows, so a table with the wrong shape is simply rebuilt
+    mismatched = []
+    for table, expected in EXPECTED_COLUMNS.items():
+        existing = table_columns(cursor, table)
+        if existing and existing != expected:
+            print(f"public.{table} has columns {existing}, recreating it")
+            mismatched.append(table)
+    if mismatched:
+        cursor.execute("DROP TABLE IF EXISTS public.financials, public.properties CASCADE")
+
+    for stmt in SCHEMA_SQL:
+        cursor.execute(stmt)
+
+    # Full reload in one transaction so readers never see a half-loaded table.
+    # Indexes are (re)built on the emptied tables so old duplicate rows cannot block them.
+    cursor.execute("TRUNCATE public.financials, public.properties")
+    for stmt in INDEX_SQL:
+        cursor.execute(stmt)
+    copy_table(cursor, "public.properties", os.path.join(DATA_DIR, "properties.csv"), PROPERTIES_COLUMNS)
+    copy_table(cursor, "public.financials", os.path.join(DATA_DIR, "financials.csv"), FINANCIALS_COLUMNS)
+
+    for stmt in VIEWS_SQL:
+        cursor.execute(stmt)
+
+    # Fresh statistics so the planner picks the indexes for generated SQL
+    for table in ["public.properties", "public.financials"] + MATERIALIZED_VIEWS:
+        cursor.execute(f"ANALYZE {table}")
+    conn.commit()
+
+if __name__ == "__main__":
+    print("Starting structured data ingestion...")
+    conn = getconn()
+    try:
+        ingest_structured_data(conn)
+    except Exception as e:
+        conn.rollback()
+        print(f"Error ingesting structured data: {e}")
+        raise
+    finally:
+        conn.close()
+        connector.close()
+    print("Structured data ingestion finished successfully!")
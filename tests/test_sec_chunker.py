@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("langchain.text_splitter")
+
+from agent_files.sec_chunker import (
+    CHILD_SIZE, PARENT_SIZE, _blocks, _pack, _piece_text, _sections, is_heading, is_table_row, section_chunks,
+)
+
+def doc(page, text):
+    return SimpleNamespace(page_content=text, metadata={"page": page})
+
+def prose(n, word="industrial"):
+    return "\n".join(f"{word} logistics lease revenue occupancy portfolio {i}" for i in range(n))
+
+TABLE = "\n".join(f"Rental revenues $ {1000 + i:,} $ {2000 + i:,} ({10 + i})" for i in range(12))
+
+@pytest.mark.parametrize("line", [
+    "PART II",
+    "ITEM 1A. RISK FACTORS",
+    "Item 7. Management's Discussion and Analysis of Financial Condition",
+    "NOTE 5. DEBT",
+    "Note 12 — Income Taxes",
+    "Item 5. Market for Registrant's Common Equity, Related Stockholder Matters and Issuer Purchases of Equity Securities",
+    "Item 1A. Risk Factors 12",
+    "PART I. FINANCIAL INFORMATION",
+    "CONSOLIDATED BALANCE SHEETS",
+])
+def test_is_heading(line):
+    assert is_heading(line)
+
+@pytest.mark.parametrize("line", [
+    "Note 6 for more details on debt",
+    "Items in transit are recorded at cost.",
+    "The risk factors below could affect our business.",
+    "ITEM 1A. " + "x" * 200,
+    "Item 1A. Risk Factors, and in our other filings with the SEC, before investing.",
+    "Part II, Item 7 of this report for a discussion of",
+    "Note 2. Summary of Significant Accounting Policies in the Notes to the",
+])
+def test_is_not_heading(line):
+    assert not is_heading(line)
+
+def test_is_table_row():
+    assert is_table_row("Rental revenues $ 1,234 $ 5,678 (12)")
+    assert is_table_row("2024 2023 2022")
+    assert not is_table_row("We had 5,000 customers in 19 countries at year end")
+
+def test_short_sections_fold_into_next_heading():
+    lines = [(0, l) for l in ["TABLE OF CONTENTS", "Item 1. Business 3", "Item 1A. Risk Factors 12", "PART I"]]
+    lines += [(1, "ITEM 1. BUSINESS")] + [(1, l) for l in prose(10).splitlines()]
+    sections = _sections(lines)
+    assert len(sections) == 1
+    assert sections[0]["title"] == "ITEM 1. BUSINESS"
+    assert sections[0]["page"] == 0
+
+def test_pack_respects_size_and_keeps_tables_whole():
+    lines = [(0, l) for l in prose(5).splitlines()] + [(1, l) for l in TABLE.splitlines()]
+    pieces = _pack(_blocks(lines), 600)
+    assert all(len(_piece_text(p)) <= 600 for p in pieces)
+    table_pieces = [p for p in pieces if "Rental revenues" in _piece_text(p)]
+    assert len(table_pieces) == 1 and _piece_text(table_pieces[0]).count("Rental revenues") == 12
+    assert table_pieces[0][-1][0] == 1
+
+def test_pack_splits_overlong_line():
+    pieces = _pack(_blocks([(0, "word " * 500)]), 100)
+    assert len(pieces) > 1 and all(len(_piece_text(p)) <= 100 for p in pieces)
+
+def sample_filing():
+    return [
+        doc(0, "PART I\nITEM 1. BUSINESS\n" + prose(40)),
+        doc(1, prose(40, "warehouse")),
+        doc(2, "ITEM 1A. RISK FACTORS\n" + prose(60, "risk")),
+        doc(3, "NOTE 5. DEBT\n" + prose(5) + "\n" + TABLE),
+    ]
+
+def test_section_chunks_sizes_and_titles():
+    parents, children = section_chunks(sample_filing(), "10k.pdf")
+    assert {p["section"] for p in parents} == {"ITEM 1. BUSINESS", "ITEM 1A. RISK FACTORS", "NOTE 5. DEBT"}
+    assert all(len(p["content"]) <= PARENT_SIZE for p in parents)
+    assert all(len(c["content"]) <= CHILD_SIZE for c in children)
+    for c in children:
+        assert c["content"].startswith(parents[c["parent_index"]]["section"] + "\n")
+    assert [c["chunk_index"] for c in children] == list(range(len(children)))
+    continued = [p for p in parents if "(continued)" in p["content"]]
+    assert continued and all(p["content"].startswith(p["section"] + " (continued)") for p in continued)
+
+def test_children_carry_their_own_page():
+    parents, children = section_chunks(sample_filing(), "10k.pdf")
+    # The BUSINESS section runs from page 0 into page 1
+    business = [c for c in children if c["content"].startswith("ITEM 1. BUSINESS")]
+    assert {c["page"] for c in business} == {0, 1}
+    for c in business:
+        # A child's page is the page its first line came from
+        first_line = c["content"].splitlines()[1]
+        assert c["page"] == (1 if first_line.startswith("warehouse") else 0)
+    for c in children:
+        assert c["page"] >= parents[c["parent_index"]]["page"]
+
+def test_table_stays_in_one_child():
+    _, children = section_chunks(sample_filing(), "10k.pdf")
+    with_table = [c for c in children if "Rental revenues" in c["content"]]
+    assert len(with_table) == 1 and with_table[0]["content"].count("Rental revenues") == 12
@@ -0,0 +1,84 @@
+import threading
+import time
+import pytest
+from agent_files.single_flight import SingleFlight, normalize_question
+
+def run_concurrently(flight, fn, n=8):
+    results, errors = [], []
+    def worker():
+        try:
+            results.append(flight.do("key", fn))
+        except BaseException as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+    results, errors = run_concurrently(SingleFlight(), slow)
+    assert len(calls) == 1
+    assert results == ["answer"] * 8 and not errors
+
+def test_followers_receive_leader_exception():
+    def fail():
+        time.sleep(0.2)
+        raise ValueError("boom")
+    results, errors = run_concurrently(SingleFlight(), fail)
+    assert not results
+    assert len(errors) == 8 and all(isinstance(e, ValueError) for e in errors)
+
+def test_followers_receive_base_exception():
+    def interrupt():
+        time.sleep(0.2)
+        raise KeyboardInterrupt
+    results, errors = run_concurrently(SingleFlight(), interrupt)
+    assert not results
+    assert len(errors) == 8 and all(isinstance(e, KeyboardInterrupt) for e in errors)
+
+def test_follower_computes_itself_after_timeout():
+    flight = SingleFlight(timeout=0.1)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("key", release.wait))
+    leader.start()
+    time.sleep(0.05)
+    assert flight.do("key", lambda: "own result") == "own result"
+    release.set()
+    leader.join()
+
+def test_timed_out_follower_skips_nested_coalescing():
+    outer, inner = SingleFlight(timeout=0.1), SingleFlight(timeout=0.1)
+    release = threading.Event()
+    # The leader hangs inside the inner layer while holding the outer key
+    leader = threading.Thread(target=lambda: outer.do("q", inner.do, "llm", release.wait))
+    leader.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    result = outer.do("q", inner.do, "llm", lambda: "own result")
+    assert result == "own result"
+    assert time.monotonic() - start < 0.18
+    # Bypass ends with the follower's own computation
+    assert inner.do("other", lambda: "fresh") == "fresh"
+    release.set()
+    leader.join()
+
+def test_completed_calls_are_not_cached():
+    flight, calls = SingleFlight(), []
+    flight.do("key", calls.append, 1)
+    flight.do("key", calls.append, 2)
+    assert calls == [1, 2]
+
+@pytest.mark.parametrize("question", [
+    "What was Prologis total available liquidity at Q2 2025?",
+    "  what was prologis  total available liquidity at q2 2025 ",
+    "WHAT WAS PROLOGIS TOTAL AVAILABLE LIQUIDITY AT Q2 2025?!",
+])
+def test_normalize_question(question):
+    assert normalize_question(question) == "what was prologis total available liquidity at q2 2025"
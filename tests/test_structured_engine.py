@@ -0,0 +1,218 @@
+import csv
+import os
+import pytest
+from agent_files.structured_engine import (
+    DATA_DIR, StructuredEngine, UnsupportedQuery, results_match, run_structured_query,
+)
+
+# Reference answers are computed straight from the CSVs with the csv module
+
+def read_csv(name):
+    with open(os.path.join(DATA_DIR, name), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+PROPERTIES = {int(r["Property_id"]): r for r in read_csv("properties.csv")}
+FINANCIALS = [
+    {
+        "property_id": int(r["Property_id"]),
+        "year": int(r["Year"]),
+        "revenue": float(r["Revenue"]),
+        "net_income_usd": float(r["Net_Income ($)"]),
+    }
+    for r in read_csv("financials.csv")
+]
+
+def property_id(name):
+    return next(pid for pid, p in PROPERTIES.items() if p["Property_Name"] == name)
+
+@pytest.fixture(scope="module")
+def engine():
+    return StructuredEngine()
+
+# questions.txt SOURCE 2
+
+def test_revenue_and_net_income_per_year_for_property(engine):
+    rows = engine.execute("""
+        SELECT f.year, f.revenue, f.net_income_usd
+        FROM public.properties AS p
+        JOIN public.financials AS f ON p.property_id = f.property_id
+        WHERE p.property_name = 'Prologis Lewisville 2'
+        ORDER BY f.year
+    """)
+    pid = property_id("Prologis Lewisville 2")
+    expected = sorted((f["year"], f["revenue"], f["net_income_usd"]) for f in FINANCIALS if f["property_id"] == pid)
+    assert [(r["year"], r["revenue"], r["net_income_usd"]) for r in rows] == expected
+    assert [r["year"] for r in rows] == [2021, 2022, 2023, 2024]
+
+def test_average_net_income_2024(engine):
+    rows = engine.execute("SELECT AVG(net_income_usd) AS avg_net_income FROM public.financials WHERE year = 2024;")
+    values = [f["net_income_usd"] for f in FINANCIALS if f["year"] == 2024]
+    assert rows == [{"avg_net_income": pytest.approx(sum(values) / len(values))}]
+
+def test_average_net_income_from_year_view(engine):
+    rows = engine.execute("SELECT avg_net_income_usd FROM public.financials_by_year WHERE year = 2024")
+    values = [f["net_income_usd"] for f in FINANCIALS if f["year"] == 2024]
+    assert rows[0]["avg_net_income_usd"] == pytest.approx(sum(values) / len(values))
+
+@pytest.mark.parametrize("metric", ["revenue", "net_income_usd"])
+def test_top_n_matches_full_sort(engine, metric):
+    rows = engine.execute(f"""
+        SELECT p.property_name, f.{metric}
+        FROM public.properties AS p
+        JOIN public.financials AS f ON p.property_id = f.property_id
+        WHERE f.year = 2023
+        ORDER BY f.{metric} DESC
+        LIMIT 3;
+    """)
+    ranked = sorted((f for f in FINANCIALS if f["year"] == 2023), key=lambda f: -f[metric])[:3]
+    assert [r[metric] for r in rows] == [f[metric] for f in ranked]
+    assert [r["property_name"] for r in rows] == [PROPERTIES[f["property_id"]]["Property_Name"] for f in ranked]
+
+def test_top_n_on_single_table(engine):
+    rows = engine.execute("SELECT property_id, revenue FROM financials ORDER BY revenue DESC LIMIT 5")
+    assert [r["revenue"] for r in rows] == sorted((f["revenue"] for f in FINANCIALS), reverse=True)[:5]
+
+def test_net_income_comparison_between_years(engine):
+    rows = engine.execute("""
+        SELECT f.year, f.net_income_usd
+        FROM properties p JOIN financials f ON f.property_id = p.property_id
+        WHERE p.property_name = 'Prologis Interchange 20, Building 3' AND f.year IN (2022, 2024)
+        ORDER BY f.year
+    """)
+    pid = property_id("Prologis Interchange 20, Building 3")
+    expected = {f["year"]: f["net_income_usd"] for f in FINANCIALS if f["property_id"] == pid}
+    assert rows == [{"year": 2022, "net_income_usd": expected[2022]}, {"year": 2024, "net_income_usd": expected[2024]}]
+
+def test_count_in_metro_over_revenue(engine):
+    rows = engine.execute("""
+        SELECT COUNT(*) FROM properties p JOIN financials f ON p.property_id = f.property_id
+        WHERE p.metro_area = 'Dallas' AND f.year = 2023 AND f.revenue > 450000
+    """)
+    expected = sum(
+        1 for f in FINANCIALS
+        if f["year"] == 2023 and f["revenue"] > 450000 and PROPERTIES[f["property_id"]]["Metro_Area"] == "Dallas"
+    )
+    assert rows == [{"count": expected}]
+
+def test_metro_and_square_footage_of_top_property(engine):
+    rows = engine.execute("""
+        SELECT p.metro_area, p.square_foot_sf
+        FROM properties p JOIN financials f ON p.property_id = f.property_id
+        WHERE f.year = 2024 ORDER BY f.revenue DESC LIMIT 1
+    """)
+    top = max((f for f in FINANCIALS if f["year"] == 2024), key=lambda f: f["revenue"])
+    prop = PROPERTIES[top["property_id"]]
+    assert rows == [{"metro_area": prop["Metro_Area"], "square_foot_sf": float(prop["Square_Foot (SF)"])}]
+
+def test_per_metro_aggregate_matches_view(engine):
+    grouped = engine.execute("""
+        SELECT p.metro_area, SUM(f.revenue) AS total_revenue
+        FROM properties p JOIN financials f ON p.property_id = f.property_id
+        WHERE f.year = 2024
+        GROUP BY p.metro_area
+    """)
+    view = engine.execute("""
+        SELECT metro_area, total_revenue FROM financials_by_metro
+        WHERE year = 2024
+    """)
+    assert results_match(grouped, view)
+    totals = {}
+    for f in FINANCIALS:
+        if f["year"] == 2024:
+            metro = PROPERTIES[f["property_id"]]["Metro_Area"]
+            totals[metro] = totals.get(metro, 0) + f["revenue"]
+    assert {r["metro_area"]: r["total_revenue"] for r in grouped} == totals
+
+def test_per_year_view(engine):
+    rows = engine.execute("SELECT year, property_count, total_revenue FROM financials_by_year ORDER BY 1")
+    assert [r["year"] for r in rows] == [2021, 2022, 2023, 2024]
+    for r in rows:
+        year_rows = [f for f in FINANCIALS if f["year"] == r["year"]]
+        assert r["property_count"] == len(year_rows)
+        assert r["total_revenue"] == sum(f["revenue"] for f in year_rows)
+
+# Clauses and predicates
+
+def test_count_properties(engine):
+    assert engine.execute("SELECT COUNT(*) as total_properties FROM public.properties;") == [{"total_properties": 100}]
+
+@pytest.mark.parametrize("limit", [0, 1, 7])
+def test_limit(engine, limit):
+    assert len(engine.execute(f"SELECT property_name FROM properties LIMIT {limit}")) == limit
+
+def test_distinct_applies_before_limit(engine):
+    rows = engine.execute("SELECT DISTINCT year FROM financials ORDER BY year DESC LIMIT 2")
+    assert rows == [{"year": 2024}, {"year": 2023}]
+
+def test_like_is_case_sensitive_and_ilike_is_not(engine):
+    like = engine.execute("SELECT property_id FROM properties WHERE property_name LIKE '%witt%'")
+    ilike = engine.execute("SELECT property_id FROM properties WHERE property_name ILIKE '%witt%'")
+    assert like == []
+    assert [r["property_id"] for r in ilike] == [
+        pid for pid, p in PROPERTIES.items() if "witt" in p["Property_Name"].lower()
+    ]
+
+def test_between_and_in(engine):
+    between = engine.execute("SELECT id FROM financials WHERE year BETWEEN 2022 AND 2023 AND revenue >= 500000")
+    expected = sum(1 for f in FINANCIALS if 2022 <= f["year"] <= 2023 and f["revenue"] >= 500000)
+    assert len(between) == expected
+    in_rows = engine.execute("SELECT DISTINCT metro_area FROM properties WHERE metro_area NOT IN ('Dallas')")
+    assert len(in_rows) == len({r["metro_area"] for r in in_rows})
+    assert {r["metro_area"] for r in in_rows} == {p["Metro_Area"] for p in PROPERTIES.values()} - {"Dallas"}
+
+def test_empty_aggregate_returns_nulls(engine):
+    assert engine.execute("SELECT MAX(revenue), COUNT(*) FROM financials WHERE year = 2030") == [{"max": None, "count": 0}]
+
+@pytest.mark.parametrize("sql", [
+    "SELECT year, COUNT(*) FROM financials GROUP BY year HAVING COUNT(*) > 1",
+    "SELECT property_name FROM properties LIMIT 5 OFFSET 5",
+    "SELECT CAST(revenue AS INTEGER) FROM financials",
+    "SELECT revenue::int FROM financials",
+    "SELECT revenue - net_income_usd FROM financials",
+    "SELECT net_income_usd / revenue AS margin FROM financials",
+    "SELECT * FROM properties p LEFT JOIN financials f ON p.property_id = f.property_id",
+    "SELECT * FROM properties p JOIN financials f ON p.property_id = p.property_id",
+    "SELECT * FROM properties p JOIN financials f ON property_id = property_id",
+    "SELECT year FROM financials GROUP BY property_id",
+    "SELECT * FROM tenants",
+    "DELETE FROM properties",
+    # Text ordering depends on the database collation
+    "SELECT DISTINCT metro_area FROM properties ORDER BY metro_area",
+    "SELECT metro_area, COUNT(*) FROM properties GROUP BY metro_area ORDER BY metro_area",
+    "SELECT MIN(property_name) FROM properties",
+    "SELECT metro_area, MAX(property_name) FROM properties GROUP BY metro_area",
+    "SELECT property_id FROM properties WHERE property_name > 'M'",
+    "SELECT property_id FROM properties WHERE property_name BETWEEN 'A' AND 'M'",
+    # property_id exists on both sides of the join
+    "SELECT property_id FROM properties p JOIN financials f ON p.property_id = f.property_id",
+    "SELECT p.property_name FROM properties p JOIN financials f ON p.property_id = f.property_id ORDER BY property_id",
+])
+def test_unsupported_queries_raise(engine, sql):
+    with pytest.raises(UnsupportedQuery):
+        engine.execute(sql)
+
+def test_text_equality_and_numeric_ordering_stay_local(engine):
+    rows = engine.execute("""
+        SELECT p.property_name, f.revenue FROM properties p JOIN financials f ON p.property_id = f.property_id
+        WHERE p.metro_area = 'Dallas' AND p.property_type <> '' AND f.year = 2024 ORDER BY f.revenue
+    """)
+    assert [r["revenue"] for r in rows] == sorted(
+        f["revenue"] for f in FINANCIALS
+        if f["year"] == 2024 and PROPERTIES[f["property_id"]]["Metro_Area"] == "Dallas"
+    )
+
+# run_structured_query
+
+def test_run_structured_query_local_mode_needs_no_database(monkeypatch):
+    monkeypatch.setenv("STRUCTURED_ENGINE_MODE", "local")
+    assert run_structured_query("SELECT COUNT(*) AS total_properties FROM properties") == [{"total_properties": 100}]
+
+# Verify-mode comparison
+
+def test_results_match_is_order_sensitive_only_when_ordered():
+    local = [{"year": 2023, "revenue": 1.0}, {"year": 2024, "revenue": 2.0}]
+    remote = list(reversed(local))
+    assert results_match(local, remote)
+    assert not results_match(local, remote, ordered=True)
+    assert results_match(local, local, ordered=True)
+    assert not results_match(local, {"error": "timeout"})